@@ -7,7 +7,7 @@
 """
 
 import asyncio
-from aioari.client import Client, log
+from aioari.client import Client, install_fast_loop, log
 from aioswagger11.http_client import AsynchronousHttpClient, ApiKeyAuthenticator
 import urllib.parse
 
@@ -17,6 +17,73 @@ from aioari.model import Channel, Bridge, Playback, LiveRecording, StoredRecordi
 import logging
 log = logging.getLogger(__name__)
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+_fast_loop_installed = False
+
+
+def install_fast_loop():
+    """Install uvloop as the asyncio event loop policy, if available.
+
+    uvloop's libuv-based transports cut the per-receive Python overhead
+    on the WebSocket path. Only loops created after this call use it, so
+    call it before starting the loop that will run the client for the
+    full benefit. Idempotent; a silent no-op when uvloop is not
+    installed.
+    """
+    global _fast_loop_installed
+    if _fast_loop_installed:
+        return
+    _fast_loop_installed = True
+    try:
+        import uvloop
+    except ImportError:
+        return
+    uvloop.install()
+
+
+# eventSource value used to drop the catch-all subscriptions on close;
+# constant, so built once at import time
+_UNSUBSCRIBE_EVENT_SOURCES = ','.join(
+    '%s:%s' % (key, value) for (key, value) in {
+        'channel': '__AST_CHANNEL_ALL_TOPIC',
+        'bridge': '__AST_BRIDGE_ALL_TOPIC',
+        'endpoint': '__AST_ENDPOINT_ALL_TOPIC',
+        'deviceState': '__AST_DEVICE_STATE_ALL_TOPIC'
+    }.items())
+
+
+class _Listener(object):
+    """Registered event callback and its dispatch parameters.
+
+    args/kwargs are normalized here so the dispatch loop does no
+    defaulting per event.
+
+    When obj_field/factory_fn are set, the dispatcher extracts that field
+    from the event and promotes it inline, calling the callback as
+    callback(obj, event, ...) without an intermediate closure frame.
+    """
+
+    __slots__ = ('callback', 'event_obj', 'args', 'kwargs', 'as_task',
+                 'is_coro', 'obj_field', 'factory_fn', 'channel_id')
+
+    def __init__(self, callback, event_obj, args, kwargs, as_task,
+                 obj_field=None, factory_fn=None):
+        self.callback = callback
+        self.event_obj = event_obj
+        self.args = args or ()
+        self.kwargs = kwargs or {}
+        self.as_task = as_task
+        self.is_coro = asyncio.iscoroutinefunction(callback)
+        self.obj_field = obj_field
+        self.factory_fn = factory_fn
+        # Channel id this record is indexed under, set by Client._register
+        self.channel_id = None
+
 
 class Client(object):
     """Async ARI Client object.
@@ -29,7 +96,23 @@ class Client(object):
         self.base_url = base_url
         self.http_client = http_client
         self.app = None
-        self.websockets = None
+        self.websockets = []
+        self._loop = None
+        self.event_models = {}
+        self.repositories = {}
+        self.event_listeners = {}
+        # Merged (typed + '*') listener tuples, keyed by event type.
+        # Invalidated whenever event_listeners is mutated.
+        self._listener_cache = {}
+        # Dispatchers specialized per event type for stable listener
+        # sets; invalidated together with _listener_cache.
+        self._dispatch_cache = {}
+        # Reverse index: channel id -> [(event_type, callback_obj)], so
+        # ChannelDestroyed cleanup is O(listeners on that channel) instead
+        # of a scan over every registered listener.
+        self._listeners_by_channel = {}
+        self.exception_handler = \
+            lambda ex: log.exception("Event listener threw exception")
         url = urllib.parse.urljoin(base_url, "ari/api-docs/resources.json")
         self.swagger = aioswagger11.client.SwaggerClient(
             http_client=http_client, url=url)
@@ -48,10 +131,13 @@ class Client(object):
         self.repositories = {
             name: Repository(self, name, api)
             for (name, api) in self.swagger.resources.items()}
-        self.websockets = set()
-        self.event_listeners = {}
-        self.exception_handler = \
-            lambda ex: log.exception("Event listener threw exception")
+        # Promote repositories into the instance dict so accesses like
+        # client.channels take the C-level attribute path instead of going
+        # through __getattr__ every time. Names that would shadow a real
+        # attribute or method stay reachable via get_repo only.
+        for name, repo in self.repositories.items():
+            if name not in self.__dict__ and not hasattr(type(self), name):
+                self.__dict__[name] = repo
 
     def __getattr__(self, item):
         """Exposes repositories as fields of the client.
@@ -70,32 +156,25 @@ class Client(object):
         This method will close any currently open WebSockets, and close the
         underlying Swaggerclient.
         """
-        unsubscribe = {
-            'channel': '__AST_CHANNEL_ALL_TOPIC',
-            'bridge': '__AST_BRIDGE_ALL_TOPIC',
-            'endpoint': '__AST_ENDPOINT_ALL_TOPIC',
-            'deviceState': '__AST_DEVICE_STATE_ALL_TOPIC'
-        }
-        unsubscribe_str = ','.join([('%s:%s' % (key, value)) for (key, value) in unsubscribe.items()])
-
         try:
-            full_url = '%sari/applications/%s/subscription?eventSource=%s' % (self.base_url, self.app, unsubscribe_str)
+            full_url = f"{self.base_url}ari/applications/{self.app}" \
+                       f"/subscription?eventSource={_UNSUBSCRIBE_EVENT_SOURCES}"
             await self.http_client.request('delete', full_url)
         except Exception as ex:
             pass
 
-        for ws in list(self.websockets):  # changes during processing
-            try:
-                host, port = self.get_peer_info(ws)
-            except TypeError:
-                # host, port = 'unknown', 'unknown'
-                self.websockets.remove(ws)
-                await ws.close()
+        # Take the whole list in one go instead of removing sockets one by
+        # one, and let the closes run concurrently
+        sockets, self.websockets = self.websockets, []
+        for ws in sockets:
+            host, port = self.get_peer_info(ws)
+            if host is None:
                 continue
-
-            log.info('Successfully disconnected from ws://%s:%s, app: %s' % (host, port, self.app))
-            self.websockets.remove(ws)
-            await ws.close()
+            log.info('Successfully disconnected from ws://%s:%s, app: %s',
+                     host, port, self.app)
+        if sockets:
+            await asyncio.gather(*[ws.close() for ws in sockets],
+                                 return_exceptions=True)
 
         await self.swagger.close()
 
@@ -103,14 +182,17 @@ class Client(object):
         """Get information about a connected peer from a websocket.
 
         :param ws: Websocket to get peer information from.
-        :return: A two-tuple (host,port) describing the connected peer. 
+        :return: A two-tuple (host,port) describing the connected peer,
+                 or (None, None) if the peer is unknown.
         """
-        # info will either be a two-tuple (host, port) for an IPV4 address, 
+        # info will either be a two-tuple (host, port) for an IPV4 address,
         # or a four-tuple (host, port, flowinfo, scope_id) for an IPV6 address.
         # see https://docs.python.org/3/library/asyncio-protocol.html#asyncio.BaseTransport.get_extra_info
         # we're only interested in host and port anyway
         info = ws.get_extra_info('peername')
-        return tuple(info[:2])
+        if info is None:
+            return None, None
+        return info[0], info[1]
 
     def get_repo(self, name):
         """Get a specific repo by name.
@@ -139,51 +221,175 @@ class Client(object):
 
         :param ws: WebSocket to drain.
         """
+        # Cache the loop so as_task dispatch skips the get_running_loop()
+        # call hidden inside asyncio.create_task
+        self._loop = asyncio.get_running_loop()
+        # The aiohttp reader queues frames as they arrive; peeking at its
+        # buffer lets us drain a burst of events in a single wakeup
+        # instead of one scheduler round trip per message.
+        buffer = getattr(getattr(ws, '_reader', None), '_buffer', None)
         # TypeChecker false positive on iter(callable, sentinel) -> iterator
         # Fixed in plugin v3.0.1
         # noinspection PyTypeChecker
         while True:
             msg = await ws.receive()
-            if msg is None:
-                return ## EOF
-            elif msg.type in {aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING}:
-                break
-            elif msg.type != aiohttp.WSMsgType.TEXT:
-                log.warning("Unknown JSON message type: %s", repr(msg))
-                continue # ignore
-            msg_json = json.loads(msg.data)
-            if not isinstance(msg_json, dict) or 'type' not in msg_json:
-                log.error("Invalid event: %s" % msg)
-                continue
-            await self.process_ws(msg_json)
+            while True:
+                if msg is None:
+                    return ## EOF
+                elif msg.type in {aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING}:
+                    return
+                elif msg.type not in {aiohttp.WSMsgType.TEXT,
+                                      aiohttp.WSMsgType.BINARY}:
+                    log.warning("Unknown JSON message type: %s", repr(msg))
+                else:
+                    # orjson parses str and bytes alike, so BINARY frames
+                    # skip the UTF-8 decode aiohttp does for TEXT ones
+                    msg_json = _loads(msg.data)
+                    msg_type = msg_json.get('type') \
+                        if isinstance(msg_json, dict) else None
+                    if msg_type is None:
+                        log.error("Invalid event: %s", msg)
+                    else:
+                        # Skip dispatch entirely when nobody is listening
+                        # and no cleanup is needed -- the common case with
+                        # subscribe_all
+                        listeners = self._get_listeners(msg_type)
+                        if listeners or msg_type == "ChannelDestroyed":
+                            dispatch = self._dispatch_cache.get(msg_type)
+                            if dispatch is None:
+                                dispatch = self._build_dispatcher(
+                                    msg_type, listeners)
+                                self._dispatch_cache[msg_type] = dispatch
+                            await dispatch(msg_json, listeners, msg_type)
+                if not buffer:
+                    break # nothing buffered; yield to the event loop
+                msg = await ws.receive()
+
+    def _invalidate_listener_cache(self, event_type):
+        """Drop cached listener tuples affected by a registration change.
+
+        :param event_type: Event type whose listener list changed.
+        """
+        if event_type == '*':
+            # A '*' listener is merged into every cached tuple
+            self._listener_cache.clear()
+            self._dispatch_cache.clear()
+        else:
+            self._listener_cache.pop(event_type, None)
+            self._dispatch_cache.pop(event_type, None)
+
+    def _get_listeners(self, event_type):
+        """Get the merged (typed + '*') listener tuple for an event type.
 
-    async def process_ws(self, msg):
+        :param event_type: Event type to look up.
+        """
+        listeners = self._listener_cache.get(event_type)
+        if listeners is None:
+            listeners = tuple(self.event_listeners.get(event_type, ())) \
+                        + tuple(self.event_listeners.get('*', ()))
+            self._listener_cache[event_type] = listeners
+        return listeners
+
+    def _build_dispatcher(self, event_type, listeners):
+        """Build a dispatcher specialized for the current listener set.
+
+        Event types with exactly one listener -- the common case -- get a
+        closure with the listener's fields pre-bound, so dispatch runs
+        with no listener loop, no attribute chasing and no record checks.
+        Everything else (multiple listeners, ChannelDestroyed cleanup)
+        uses the generic process_ws.
+
+        :param event_type: Event type the dispatcher is built for.
+        :param listeners: Merged listener tuple for that type.
+        """
+        if len(listeners) != 1 or event_type == "ChannelDestroyed":
+            return self.process_ws
+        listener = listeners[0]
+        callback = listener.callback
+        args = listener.args
+        kwargs = listener.kwargs
+        as_task = listener.as_task
+        is_coro = listener.is_coro
+        obj_field = listener.obj_field
+        factory_fn = listener.factory_fn
+
+        async def dispatch(msg, listeners=None, msg_type=None):
+            # noinspection PyBroadException
+            try:
+                if obj_field is not None:
+                    val = msg.get(obj_field)
+                    obj = factory_fn(self, val) if val else None
+                    cb = callback(obj, msg, *args, **kwargs)
+                else:
+                    cb = callback(msg, *args, **kwargs)
+                if is_coro or (cb is not None and hasattr(cb, '__await__')):
+                    if as_task:
+                        loop = self._loop
+                        if loop is None:
+                            loop = self._loop = asyncio.get_running_loop()
+                        loop.create_task(cb)
+                    else:
+                        await cb
+            except Exception as e:
+                self.exception_handler(e)
+
+        return dispatch
+
+    async def process_ws(self, msg, listeners=None, msg_type=None):
         """Process one incoming websocket message"""
 
-        listeners = list(self.event_listeners.get(msg['type'], [])) \
-                    + list(self.event_listeners.get('*', []))
+        if msg_type is None:
+            msg_type = msg['type']
+        if listeners is None:
+            listeners = self._get_listeners(msg_type)
+        debug = log.isEnabledFor(logging.DEBUG)
+        pending_tasks = None
         for listener in listeners:
             # noinspection PyBroadException
             try:
-                callback, event_obj, args, kwargs, as_task = listener
-                log.debug("cb_type=%s" % type(callback))
-                args = args or ()
-                kwargs = kwargs or {}
-                cb = callback(msg, *args, **kwargs)
-                # The callback may or may not be an async function
-                if hasattr(cb,'__await__'):
-                    if as_task:
-                        asyncio.create_task(cb)
+                if debug:
+                    log.debug("cb_type=%s", type(listener.callback))
+                if listener.obj_field is not None:
+                    # Fused object-event path: promote the field inline
+                    # instead of going through an extraction closure
+                    val = msg.get(listener.obj_field)
+                    obj = listener.factory_fn(self, val) if val else None
+                    cb = listener.callback(obj, msg,
+                                           *listener.args, **listener.kwargs)
+                else:
+                    cb = listener.callback(msg,
+                                           *listener.args, **listener.kwargs)
+                # Coroutine functions are flagged once at registration;
+                # the hasattr probe only runs for plain callables that may
+                # still hand back an awaitable
+                if listener.is_coro or \
+                        (cb is not None and hasattr(cb, '__await__')):
+                    if listener.as_task:
+                        # Collect as_task coroutines and schedule them in
+                        # one batch after the loop, instead of
+                        # interleaving task creation with awaited callbacks
+                        if pending_tasks is None:
+                            pending_tasks = []
+                        pending_tasks.append(cb)
                     else:
                         await cb
 
             except Exception as e:
                 self.exception_handler(e)
 
-        if msg['type'] == "ChannelDestroyed":
-            for i in tuple(self.event_listeners.keys()):
-                for o in [item for item in self.event_listeners[i] if msg.get('channel').get('id') in item]:
-                    self.event_listeners[i].remove(o)
+        if pending_tasks:
+            loop = self._loop
+            if loop is None:
+                loop = self._loop = asyncio.get_running_loop()
+            for coro in pending_tasks:
+                loop.create_task(coro)
+
+        if msg_type == "ChannelDestroyed":
+            channel = msg.get('channel') or {}
+            entries = self._listeners_by_channel.pop(channel.get('id'), None)
+            if entries:
+                for event_type, callback_obj in entries:
+                    self._unregister(event_type, callback_obj)
 
     async def run(self, apps, subscribe_all=False, *, _test_msgs=[]):
         """Connect to the WebSocket and begin processing messages.
@@ -194,10 +400,10 @@ class Client(object):
         :param apps: Application (or list of applications) to connect for
         :type  apps: str or list of str
         """
-        self.app = apps.split('&')[0]
+        if isinstance(apps, list):
+            apps = ','.join(apps)
+        self.app = apps.split('&', 1)[0]
         while True:
-            if isinstance(apps, list):
-                apps = ','.join(apps)
             try:
                 ws = await self.swagger.events.eventWebsocket(app=apps, subscribeAll=subscribe_all)
             except (OSError, aiohttp.ClientConnectionError, aiohttp.WSServerHandshakeError) as ex:
@@ -205,8 +411,9 @@ class Client(object):
                 await asyncio.sleep(1)
                 continue
             host, port = self.get_peer_info(ws)
-            log.info('Successfully connected to ws://%s:%s, app: %s' % (host, port, self.app))
-            self.websockets.add(ws)
+            log.info('Successfully connected to ws://%s:%s, app: %s',
+                     host, port, self.app)
+            self.websockets.append(ws)
 
             # For tests
             for m in _test_msgs:
@@ -224,13 +431,39 @@ class Client(object):
         :param args: Arguments to pass to event_cb
         :param kwargs: Keyword arguments to pass to event_cb
         """
+        listeners = self.event_listeners.get(event_type)
+        if listeners:
+            for cb in tuple(listeners):
+                if event_cb == cb.callback:
+                    self._unregister(event_type, cb)
+        callback_obj = _Listener(event_cb, event_obj, args, kwargs, as_task)
+        log.debug("event_cb=%s", event_cb)
+        return self._register(event_type, callback_obj)
+
+    def _register(self, event_type, callback_obj):
+        """Insert a listener record and return its unsubscriber.
+
+        :param event_type: String name of the event to register for.
+        :param callback_obj: Listener record to insert.
+        """
         listeners = self.event_listeners.setdefault(event_type, list())
-        for cb in listeners:
-            if event_cb == cb[0]:
-                listeners.remove(cb)
-        callback_obj = (event_cb, event_obj, args, kwargs, as_task)
-        log.debug("event_cb=%s" % event_cb)
         listeners.append(callback_obj)
+        self._invalidate_listener_cache(event_type)
+        # Index channel-bound listeners so ChannelDestroyed can drop them
+        # without scanning every listener list. Only Channel objects and
+        # plain channel-id strings are indexed; other domain objects have
+        # no event that would ever drain their entries.
+        event_obj = callback_obj.event_obj
+        if isinstance(event_obj, Channel):
+            channel_id = event_obj.id
+        elif isinstance(event_obj, str):
+            channel_id = event_obj
+        else:
+            channel_id = None
+        if channel_id:
+            callback_obj.channel_id = channel_id
+            self._listeners_by_channel.setdefault(channel_id, []) \
+                .append((event_type, callback_obj))
         client = self
 
         class EventUnsubscriber(object):
@@ -240,13 +473,33 @@ class Client(object):
             def close(self):
                 """Unsubscribe the associated event callback.
                 """
-                if callback_obj in client.event_listeners[event_type]:
-                    client.event_listeners[event_type].remove(callback_obj)
+                client._unregister(event_type, callback_obj)
 
         return EventUnsubscriber()
 
+    def _unregister(self, event_type, callback_obj):
+        """Remove a listener record and its reverse-index entry, if any.
+
+        :param event_type: Event type the record was registered under.
+        :param callback_obj: Listener record to remove.
+        """
+        listeners = self.event_listeners.get(event_type)
+        if listeners and callback_obj in listeners:
+            listeners.remove(callback_obj)
+            self._invalidate_listener_cache(event_type)
+        channel_id = callback_obj.channel_id
+        if channel_id is not None:
+            entries = self._listeners_by_channel.get(channel_id)
+            if entries:
+                try:
+                    entries.remove((event_type, callback_obj))
+                except ValueError:
+                    pass
+                if not entries:
+                    del self._listeners_by_channel[channel_id]
+
     def on_object_event(self, event_type, event_cb, factory_fn, model_id, as_task=False,
-                        *args, **kwargs):
+                        *args, event_obj=None, **kwargs):
         """Register callback for events with the given type. Event fields of
         the given model_id type are passed along to event_cb.
 
@@ -262,7 +515,8 @@ class Client(object):
         :param kwargs: Keyword arguments to pass to event_cb
         """
         # Find the associated model from the Swagger declaration
-        log.debug("On object event %s %s %s %s"%(event_type, event_cb, factory_fn, model_id))
+        log.debug("On object event %s %s %s %s",
+                  event_type, event_cb, factory_fn, model_id)
         event_model = self.event_models.get(event_type)
         if not event_model:
             raise ValueError("Cannot find event model '%s'" % event_type)
@@ -274,6 +528,16 @@ class Client(object):
             raise ValueError("Event model '%s' has no fields of type %s"
                              % (event_type, model_id))
 
+        # Specialize at registration time: the common single-field case
+        # (Channel, Bridge, ...) is fused into the dispatch loop itself,
+        # which promotes the field inline and calls event_cb with no
+        # extraction closure in between.
+        if len(obj_fields) == 1:
+            callback_obj = _Listener(event_cb, event_obj, args, kwargs,
+                                     as_task, obj_field=obj_fields[0],
+                                     factory_fn=factory_fn)
+            return self._register(event_type, callback_obj)
+
         def extract_objects(event, *args, **kwargs):
             """Extract objects of a given type from an event.
 
@@ -286,16 +550,10 @@ class Client(object):
             obj = {obj_field: factory_fn(self, event[obj_field])
                    for obj_field in obj_fields
                    if event.get(obj_field)}
-            # If there's only one field in the schema, just pass that along
-            if len(obj_fields) == 1:
-                if obj:
-                    vals = list(obj.values())
-                    obj = vals[0]
-                else:
-                    obj = None
             return event_cb(obj, event, *args, **kwargs)
 
-        return self.on_event(event_type, extract_objects, as_task=as_task,
+        return self.on_event(event_type, extract_objects, event_obj=event_obj,
+                             as_task=as_task,
                              *args,
                              **kwargs)
 
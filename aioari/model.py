@@ -148,9 +148,10 @@ class BaseObject(object):
         return "%s(%s)" % (self.__class__.__name__, self.id)
 
     def cleanup(self, event_obj):
-        for i in tuple(self.event_listeners.keys()):
-            for o in [item for item in self.event_listeners[i] if event_obj in item]:
-                self.event_listeners[i].remove(o)
+        for listeners in self.event_listeners.values():
+            for i in range(len(listeners) - 1, -1, -1):
+                if listeners[i].event_obj == event_obj:
+                    del listeners[i]
 
     def __getattr__(self, item):
         """Promote resource operations related to a single resource to methods
@@ -217,7 +218,8 @@ class BaseObject(object):
             msg = "Event callback registration called on object with no events"
             raise RuntimeError(msg)
 
-        return self.event_reg(event_type, fn_filter, *args, **kwargs)
+        return self.event_reg(event_type, fn_filter, *args,
+                              event_obj=self, **kwargs)
 
 
 class Channel(BaseObject):
@@ -435,7 +437,7 @@ async def promote(client, resp, operation_json):
         return factory(client, resp_json)
     if resp.status == HTTPNoContent.status_code:
         return None
-    log.info("No mapping for %s; returning JSON" % response_class)
+    log.info("No mapping for %s; returning JSON", response_class)
     return json.loads(res)
 
 
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+
+"""Event dispatch testing.
+
+These tests drive the client's listener caches and dispatch paths
+directly through process_ws, without a Swagger connection or WebSocket.
+"""
+
+import pytest
+
+import aioari
+
+BASE_URL = "http://ari.py/ari"
+
+EVENT_MODELS = {
+    'StasisStart': {'properties': {'channel': {'type': 'Channel'}}},
+    'PairEvent': {'properties': {'one': {'type': 'Thing'},
+                                 'two': {'type': 'Thing'}}},
+}
+
+
+class Thing(object):
+    """Stand-in domain object built by the factory function.
+
+    :param client: ARI client.
+    :param obj_json: Instance data.
+    """
+
+    def __init__(self, client, obj_json):
+        self.client = client
+        self.json = obj_json
+        self.id = obj_json['id']
+
+
+def raise_exceptions(ex):
+    """Testing exception handler for ARI client.
+
+    :param ex: Exception caught by the event loop.
+    """
+    raise ex
+
+
+def make_client():
+    """Create an ARI client with dispatch state but no connection.
+
+    The http_client stub is never used: nothing here calls init() or
+    issues requests, so no session is opened.
+    """
+    client = aioari.Client(BASE_URL, object())
+    client.event_models = EVENT_MODELS
+    client.exception_handler = raise_exceptions
+    return client
+
+
+@pytest.mark.asyncio
+async def test_listener_cache_invalidated_on_register():
+    client = make_client()
+    actual = []
+    client.on_event('ev', lambda event: actual.append(('first', event)))
+    assert len(client._get_listeners('ev')) == 1
+    # The cache is primed now; a second registration must invalidate it
+    client.on_event('ev', lambda event: actual.append(('second', event)))
+    assert len(client._get_listeners('ev')) == 2
+    msg = {'type': 'ev', 'data': 1}
+    await client.process_ws(msg)
+    assert actual == [('first', msg), ('second', msg)]
+
+
+@pytest.mark.asyncio
+async def test_listener_cache_invalidated_on_unsubscribe():
+    client = make_client()
+    actual = []
+    sub = client.on_event('ev', actual.append)
+    assert len(client._get_listeners('ev')) == 1
+    sub.close()
+    assert client._get_listeners('ev') == ()
+    await client.process_ws({'type': 'ev', 'data': 1})
+    assert actual == []
+
+
+@pytest.mark.asyncio
+async def test_star_registration_clears_cached_types():
+    client = make_client()
+    actual = []
+    client.on_event('ev', lambda event: None)
+    assert len(client._get_listeners('ev')) == 1
+    # A '*' listener must show up in already-cached typed tuples
+    client.on_event('*', actual.append)
+    assert len(client._get_listeners('ev')) == 2
+    msg = {'type': 'ev', 'data': 1}
+    await client.process_ws(msg)
+    assert actual == [msg]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_cache_invalidated_on_register():
+    client = make_client()
+    client._dispatch_cache['ev'] = object()
+    client.on_event('ev', lambda event: None)
+    assert 'ev' not in client._dispatch_cache
+    client._dispatch_cache['ev'] = object()
+    client._dispatch_cache['other'] = object()
+    client.on_event('*', lambda event: None)
+    assert client._dispatch_cache == {}
+
+
+@pytest.mark.asyncio
+async def test_dispatch_cache_invalidated_on_unsubscribe():
+    client = make_client()
+    sub = client.on_event('ev', lambda event: None)
+    client._dispatch_cache['ev'] = object()
+    sub.close()
+    assert 'ev' not in client._dispatch_cache
+
+
+@pytest.mark.asyncio
+async def test_specialized_dispatcher_single_listener():
+    client = make_client()
+    actual = []
+    client.on_event('ev', actual.append)
+    listeners = client._get_listeners('ev')
+    dispatch = client._build_dispatcher('ev', listeners)
+    assert dispatch != client.process_ws
+    msg = {'type': 'ev', 'data': 1}
+    await dispatch(msg)
+    assert actual == [msg]
+
+
+@pytest.mark.asyncio
+async def test_specialized_dispatcher_falls_back_to_generic():
+    client = make_client()
+    client.on_event('ev', lambda event: None)
+    client.on_event('ev', lambda event: None)
+    listeners = client._get_listeners('ev')
+    assert len(listeners) == 2
+    # Multiple listeners and ChannelDestroyed use the generic path
+    assert client._build_dispatcher('ev', listeners) == client.process_ws
+    assert client._build_dispatcher(
+        'ChannelDestroyed', listeners[:1]) == client.process_ws
+
+
+@pytest.mark.asyncio
+async def test_object_event_promotes_single_field():
+    client = make_client()
+    actual = []
+
+    def cb(obj, event):
+        actual.append((obj, event))
+
+    client.on_object_event('StasisStart', cb, Thing, 'Channel')
+    msg = {'type': 'StasisStart', 'channel': {'id': 'test-channel'}}
+    await client.process_ws(msg)
+    assert len(actual) == 1
+    obj, event = actual[0]
+    assert isinstance(obj, Thing)
+    assert obj.id == 'test-channel'
+    assert event is msg
+
+
+@pytest.mark.asyncio
+async def test_object_event_missing_field_passes_none():
+    client = make_client()
+    actual = []
+    client.on_object_event('StasisStart', lambda obj, event: actual.append(obj),
+                           Thing, 'Channel')
+    await client.process_ws({'type': 'StasisStart'})
+    assert actual == [None]
+
+
+@pytest.mark.asyncio
+async def test_object_event_multi_field_passes_dict():
+    client = make_client()
+    actual = []
+    client.on_object_event('PairEvent', lambda obj, event: actual.append(obj),
+                           Thing, 'Thing')
+    await client.process_ws({'type': 'PairEvent',
+                             'one': {'id': 'a'}, 'two': {'id': 'b'}})
+    assert len(actual) == 1
+    assert sorted(actual[0].keys()) == ['one', 'two']
+    assert actual[0]['one'].id == 'a'
+    assert actual[0]['two'].id == 'b'
+
+
+@pytest.mark.asyncio
+async def test_channel_destroyed_removes_bound_listeners():
+    client = make_client()
+    actual = []
+    client.on_event('ChannelStateChange',
+                    lambda event: actual.append('doomed'),
+                    event_obj='test-channel')
+    client.on_event('ChannelStateChange',
+                    lambda event: actual.append('kept'),
+                    event_obj='other-channel')
+    await client.process_ws({'type': 'ChannelDestroyed',
+                             'channel': {'id': 'test-channel'}})
+    remaining = client.event_listeners['ChannelStateChange']
+    assert [l.event_obj for l in remaining] == ['other-channel']
+    assert 'test-channel' not in client._listeners_by_channel
+    await client.process_ws({'type': 'ChannelStateChange'})
+    assert actual == ['kept']
+
+
+@pytest.mark.asyncio
+async def test_channel_destroyed_without_listeners():
+    client = make_client()
+    # Must be a no-op, not an error
+    await client.process_ws({'type': 'ChannelDestroyed',
+                             'channel': {'id': 'test-channel'}})
+    assert client._listeners_by_channel == {}
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_purges_reverse_index():
+    client = make_client()
+    sub = client.on_event('ChannelStateChange', lambda event: None,
+                          event_obj='test-channel')
+    assert 'test-channel' in client._listeners_by_channel
+    sub.close()
+    assert 'test-channel' not in client._listeners_by_channel
+
+
+@pytest.mark.asyncio
+async def test_non_channel_objects_are_not_indexed():
+    client = make_client()
+    thing = Thing(client, {'id': 'thing-1'})
+    client.on_event('ThingEvent', lambda event: None, event_obj=thing)
+    assert 'thing-1' not in client._listeners_by_channel
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -5,7 +5,8 @@
 
 import pytest
 
-pytest.skip()
+pytest.skip("WebSocket stub tests need porting to current pytest-asyncio",
+            allow_module_level=True)
 
 import aioari
 import aiohttp